@@ -3,25 +3,33 @@ Main script file to run backend and database.
 """
 
 import argparse
-import unittest
-import uvicorn
-import tests.test_parser
-import tests.test_tree_traversal
 
 def _run_tests():
     """Run tests."""
+    import unittest
+    import tests.test_parser
+    import tests.test_tree_traversal
+    import tests.test_serialization
+    import tests.test_compiler
+
     print("--test: running tests")
 
     loader = unittest.TestLoader()
     suite_parser = loader.loadTestsFromModule(tests.test_parser)
     suite_tree = loader.loadTestsFromModule(tests.test_tree_traversal)
+    suite_serialization = loader.loadTestsFromModule(tests.test_serialization)
+    suite_compiler = loader.loadTestsFromModule(tests.test_compiler)
 
     runner = unittest.TextTestRunner()
     runner.run(suite_parser)
     runner.run(suite_tree)
+    runner.run(suite_serialization)
+    runner.run(suite_compiler)
 
 def _run_dev_api_server(host = None, port = None):
     """Run a dev instance of the FastAPI server."""
+    import uvicorn
+
     if not host:
         host = "0.0.0.0"
 
@@ -32,8 +40,12 @@ def _run_dev_api_server(host = None, port = None):
 
 def _run_db_migrate():
     """Instantiate Postgres DB with schema, and empty tables."""
+    from rule_engine import models
+
     print("--migrate: running DB Migrate")
 
+    models.migrate()
+
 def _run_start_db():
     """Start the DB instance on local machine."""
     print("--db: starting DB")
@@ -41,11 +53,12 @@ def _run_start_db():
 def _show_help():
     """Show help information."""
     help_string = (
-        "usage: main.py [-h] [--tests] [--dev] [--host HOST] [--port PORT]\n\n"
+        "usage: main.py [-h] [--tests] [--dev] [--migrate] [--host HOST] [--port PORT]\n\n"
         "options:\n"
         "-h, --help         show this help message and exit\n"
         "--tests            Run tests for Parser and AST\n"
         "--dev              Run dev FastAPI Server\n"
+        "--migrate          Create or update the DB schema\n"
         "--host HOST        Add host address to run the FastAPI Server\n"
         "--port PORT        Add port address to run the FastAPI Server\n"
     )
@@ -60,6 +73,7 @@ def main():
 
     parser.add_argument('--tests', action='store_true', help='Run tests for Parser and AST')
     parser.add_argument('--dev', action='store_true', help='Run dev FastAPI Server')
+    parser.add_argument('--migrate', action='store_true', help='Create or update the DB schema')
     parser.add_argument('--host', dest='host', type=str, help='Add host address to run the FastAPI Server')
     parser.add_argument('--port', dest='port', type=int, help='Add port address to run the FastAPI Server')
 
@@ -69,6 +83,8 @@ def main():
         _run_tests()
     elif args.dev:
         _run_dev_api_server(args.host, args.port)
+    elif args.migrate:
+        _run_db_migrate()
     else:
         _show_help()
 
@@ -6,12 +6,52 @@ an Abstract Syntax Tree (AST) for rules, as well as to combine
 multiple rules into a single AST.
 """
 
-from typing import List, TypeVar
+import operator
+import sys
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Optional, TypeVar
 from abc import ABC, abstractmethod
 
 
 T = TypeVar('T')
 
+# Comparison functions by comparison type, resolved once per Condition.
+_COMPARATORS = {
+    'gt': operator.gt,
+    'lt': operator.lt,
+    'eq': operator.eq,
+    'ge': operator.ge,
+    'le': operator.le,
+    'ne': operator.ne,
+}
+
+# Comparison symbols produced by the parser, normalized to comparison types.
+_COMPARISON_ALIASES = {
+    '>': 'gt',
+    '<': 'lt',
+    '=': 'eq',
+    '==': 'eq',
+    '>=': 'ge',
+    '<=': 'le',
+    '!=': 'ne',
+}
+
+# Value of a variable that is missing from the data. Conditions on a missing
+# variable are false, like comparisons between incompatible types, so that
+# evaluating a rule never raises and AND/OR children commute.
+MISSING = object()
+
+def _never(input_value, rvalue):
+    """Comparator for unknown comparison types, which never match."""
+    return False
+
+# Opcodes of a flattened AST.
+OP_AND = 0
+OP_OR = 1
+OP_OPERAND = 2
+
 class Node:
     def __init__(self, node_type, left=None, right=None, value=None):
         self.node_type = node_type
@@ -21,26 +61,26 @@ class Node:
 
     def evaluate(self, data):
         if self.node_type == 'operand':
-            return self.value.evaluate(data[self.value.lvariable])
+            return self.value.evaluate(data.get(self.value.lvariable, MISSING))
         elif self.node_type == 'operator':
             return self.value.evaluate(self.left, self.right, data)
 
 
 class Condition:
     def __init__(self, lvariable, rvalue, comparison_type):
-        self.lvariable = lvariable
+        self.lvariable = sys.intern(lvariable)
         self.rvalue = rvalue
-        self.comparison_type = comparison_type
+        self.comparison_type = _COMPARISON_ALIASES.get(comparison_type, comparison_type)
+        # Add more comparison types to _COMPARATORS as needed
+        self._cmp = _COMPARATORS.get(self.comparison_type, _never)
 
     def evaluate(self, input_value):
-        if self.comparison_type == 'gt':
-            return input_value > self.rvalue
-        elif self.comparison_type == 'lt':
-            return input_value < self.rvalue
-        elif self.comparison_type == 'eq':
-            return input_value == self.rvalue
-        # Add more comparison types as needed
-        return False
+        if input_value is MISSING:
+            return False
+        try:
+            return self._cmp(input_value, self.rvalue)
+        except TypeError:
+            return False
 
 class Operator(ABC):
     """
@@ -71,17 +111,271 @@ class OROperator(Operator):
         return left.evaluate(data) or right.evaluate(data)
 
 
+# Operators are stateless, so ASTs built by the engine share these instances.
+AND_OPERATOR = ANDOperator()
+OR_OPERATOR = OROperator()
+
+
+@dataclass
+class FlatAST:
+    """
+    An AST flattened into parallel arrays in post-order.
+
+    Every node's children come before it, so the rule is evaluated by a
+    single loop over the program counter.
+
+    Attributes:
+        opcodes (array): The opcode of each node.
+        right_idx (array): Index of each operator's right child, -1 otherwise.
+        operand_idx (array): Index into ``operand_table`` of each operand,
+            -1 otherwise.
+        parent_idx (array): Index of the parent operator of each left child,
+            used to short-circuit over the right subtree, -1 otherwise.
+        operand_table (List[Condition]): The conditions of the operands.
+    """
+    opcodes: array = field(default_factory=lambda: array('B'))
+    right_idx: array = field(default_factory=lambda: array('i'))
+    operand_idx: array = field(default_factory=lambda: array('i'))
+    parent_idx: array = field(default_factory=lambda: array('i'))
+    operand_table: List[Condition] = field(default_factory=list)
+
+    def evaluate(self, data):
+        """
+        Evaluate the flattened rule.
+
+        Args:
+            data (dict): The data to evaluate the rule against.
+
+        Returns:
+            bool: The result of the evaluation.
+        """
+        opcodes = self.opcodes
+        right_idx = self.right_idx
+        operand_idx = self.operand_idx
+        parent_idx = self.parent_idx
+        operand_table = self.operand_table
+        size = len(opcodes)
+        if not size:
+            return True
+
+        values = [None] * size
+        pc = 0
+        while pc < size:
+            if opcodes[pc] == OP_OPERAND:
+                condition = operand_table[operand_idx[pc]]
+                value = condition.evaluate(data.get(condition.lvariable, MISSING))
+            else:
+                # Reached only when the left child did not decide the result.
+                value = values[right_idx[pc]]
+            values[pc] = value
+            parent = parent_idx[pc]
+            while parent >= 0 and bool(value) != (opcodes[parent] == OP_AND):
+                # The left child decides its parent; skip the right subtree.
+                values[parent] = value
+                pc = parent
+                parent = parent_idx[pc]
+            pc += 1
+        return values[-1]
+
+
+class ConditionStats:
+    """
+    Observed true-rates of conditions, keyed by their contents.
+
+    Instances are safe to share between threads.
+
+    Attributes:
+        counts (dict): Maps a condition key to its true and total counts.
+    """
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(condition: Condition) -> tuple:
+        """
+        Build the key identifying a condition.
+
+        Args:
+            condition (Condition): The condition.
+
+        Returns:
+            tuple: The condition's variable, comparison type and value.
+        """
+        return (condition.lvariable, condition.comparison_type, condition.rvalue)
+
+    def record(self, condition: Condition, result: bool) -> None:
+        """
+        Record one evaluation result of a condition.
+
+        Args:
+            condition (Condition): The evaluated condition.
+            result (bool): The result of the evaluation.
+        """
+        key = self.key(condition)
+        with self._lock:
+            counts = self.counts.setdefault(key, [0, 0])
+            counts[0] += bool(result)
+            counts[1] += 1
+
+    def true_rate(self, condition: Condition, default: float = 0.5) -> float:
+        """
+        Return the fraction of recorded evaluations of a condition that were true.
+
+        Args:
+            condition (Condition): The condition.
+            default (float): The rate returned for unseen conditions.
+
+        Returns:
+            float: The observed true-rate.
+        """
+        key = self.key(condition)
+        with self._lock:
+            counts = self.counts.get(key)
+            if not counts:
+                return default
+            return counts[0] / counts[1]
+
+
 class AST:
     def __init__(self, root=None):
         self.root = root
 
     def evaluate_rule(self, data):
-        return self._evaluate_node(self.root, data)
+        return self.evaluate_iter(data)
+
+    def evaluate_iter(self, data, stats=None):
+        """
+        Evaluate the AST with an explicit stack instead of recursion.
+
+        AND and OR short-circuit: once the left child decides the result,
+        the right subtree is skipped.
 
-    def _evaluate_node(self, node, data):
-        if node is None:
+        Args:
+            data (dict): The data to evaluate the rule against.
+            stats (ConditionStats, optional): Records the result of every
+                condition evaluated.
+
+        Returns:
+            bool: The result of the evaluation.
+        """
+        if self.root is None:
             return True
-        return node.evaluate(data)
+
+        # Each entry is a node and whether its left child was evaluated.
+        stack = [(self.root, False)]
+        values = []
+        while stack:
+            node, visited = stack.pop()
+            op = node.value
+            if node.node_type != 'operator' or not isinstance(op, (ANDOperator, OROperator)):
+                value = node.evaluate(data)
+                if stats is not None and node.node_type == 'operand':
+                    stats.record(op, value)
+                values.append(value)
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.left, False))
+            elif bool(values[-1]) == isinstance(op, ANDOperator):
+                # The left value does not decide the result, so the right
+                # child's value replaces it.
+                values.pop()
+                stack.append((node.right, False))
+        return values.pop()
+
+    def flatten(self) -> FlatAST:
+        """
+        Flatten the AST into a FlatAST.
+
+        Returns:
+            FlatAST: The flattened AST.
+
+        Raises:
+            ValueError: If the AST contains an unsupported node.
+        """
+        flat = FlatAST()
+        if self.root is None:
+            return flat
+
+        # Each entry is a node and whether its children were emitted; the
+        # indices of emitted nodes are kept on a separate stack.
+        stack = [(self.root, False)]
+        emitted = []
+        while stack:
+            node, visited = stack.pop()
+            if node.node_type == 'operand':
+                flat.opcodes.append(OP_OPERAND)
+                flat.right_idx.append(-1)
+                flat.operand_idx.append(len(flat.operand_table))
+                flat.operand_table.append(node.value)
+            elif node.node_type != 'operator':
+                raise ValueError(f"Unsupported node type: {node.node_type!r}")
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            else:
+                if isinstance(node.value, ANDOperator):
+                    flat.opcodes.append(OP_AND)
+                elif isinstance(node.value, OROperator):
+                    flat.opcodes.append(OP_OR)
+                else:
+                    raise ValueError(f"Unsupported operator: {node.value!r}")
+                right = emitted.pop()
+                left = emitted.pop()
+                flat.right_idx.append(right)
+                flat.operand_idx.append(-1)
+                flat.parent_idx[left] = len(flat.opcodes) - 1
+            flat.parent_idx.append(-1)
+            emitted.append(len(flat.opcodes) - 1)
+        return flat
+
+    def reorder(self, stats: 'ConditionStats') -> bool:
+        """
+        Reorder the children of AND/OR nodes to short-circuit sooner.
+
+        AND nodes evaluate their least likely true child first, and OR nodes
+        their most likely true child first. Subtree true-rates are estimated
+        from the conditions' observed rates, assuming independence.
+
+        Evaluation never raises, since missing variables and incompatible
+        types make a condition false, so swapping children keeps the result
+        of the rule for any data.
+
+        Args:
+            stats (ConditionStats): The observed condition true-rates.
+
+        Returns:
+            bool: True if any children were swapped.
+        """
+        if self.root is None:
+            return False
+
+        changed = False
+        stack = [(self.root, False)]
+        rates = []
+        while stack:
+            node, visited = stack.pop()
+            if node.node_type != 'operator':
+                rates.append(stats.true_rate(node.value))
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                right = rates.pop()
+                left = rates.pop()
+                if isinstance(node.value, ANDOperator):
+                    swap = left > right
+                    rates.append(left * right)
+                else:
+                    swap = isinstance(node.value, OROperator) and left < right
+                    rates.append(1 - (1 - left) * (1 - right))
+                if swap:
+                    node.left, node.right = node.right, node.left
+                    changed = True
+        return changed
 
     def create_rule(self, rule: str) -> bool:
         """
@@ -127,8 +421,8 @@ class AST:
 
         most_frequent_operator = 'AND' if operator_count['AND'] >= \
             operator_count['OR'] else 'OR'
-        operator_class = ANDOperator if most_frequent_operator == 'AND' \
-            else OROperator
+        root_operator = AND_OPERATOR if most_frequent_operator == 'AND' \
+            else OR_OPERATOR
 
         # Combine all ASTs into one using the most frequent operator
         while len(asts) > 1:
@@ -138,9 +432,34 @@ class AST:
                 node_type="operator",
                 left=left_ast,
                 right=right_ast,
-                value=operator_class()
+                value=root_operator
             )
             asts.append(combined_ast)
 
         self.root = asts[0]
         return True
+
+
+def combine_balanced(roots: List[Node], operator: Operator = AND_OPERATOR) -> Optional[Node]:
+    """
+    Join AST roots with an operator into a balanced tree.
+
+    Roots are paired up level by level, so the combined tree has depth
+    O(log N) instead of O(N) for N roots.
+
+    Args:
+        roots (List[Node]): The root nodes to combine, in order.
+        operator (Operator): The operator joining the roots.
+
+    Returns:
+        Optional[Node]: The combined root, or None if there are no roots.
+    """
+    while len(roots) > 1:
+        paired = [
+            Node(node_type="operator", left=left, right=right, value=operator)
+            for left, right in zip(roots[::2], roots[1::2])
+        ]
+        if len(roots) % 2:
+            paired.append(roots[-1])
+        roots = paired
+    return roots[0] if roots else None
@@ -0,0 +1,241 @@
+"""
+Compilation of rule ASTs into Python functions.
+
+This module emits a rule's AST as a single Python expression and compiles
+it, either for one row of data or for many rows given as columns.
+"""
+
+from itertools import repeat
+from typing import Callable, Dict, List, Optional
+from rule_engine.ast_utils import MISSING, ANDOperator, AST, Condition, Node, OROperator
+
+# Comparison types that compile_ast can inline as Python operators. Symbols
+# produced by the parser, such as '>', are normalized to these by Condition.
+_SOURCE_COMPARATORS = {
+    'gt': '>',
+    'lt': '<',
+    'eq': '==',
+    'ge': '>=',
+    'le': '<=',
+    'ne': '!=',
+}
+
+# Compiled evaluators run the inlined expression, and rerun the rule through
+# the interpreter when a comparison raises, such as between a missing
+# variable and a number. The interpreter treats those comparisons as false.
+_FUNCTION_TEMPLATE = """\
+def evaluate(data):
+    try:
+        return {source}
+    except TypeError:
+        return _fallback(data)
+"""
+
+_BATCH_TEMPLATE = """\
+def evaluate(columns, size):
+    try:
+        return [{source} for {targets} in zip({iterables})]
+    except TypeError:
+        return _fallback(columns, size)
+"""
+
+def compile_ast(node: Node) -> Callable[[dict], bool]:
+    """
+    Compile an AST into a single Python function evaluating the rule.
+
+    The tree is emitted as one boolean expression and compiled once, so each
+    evaluation runs as plain bytecode instead of dispatching per node.
+    Conditions that cannot be inlined fall back to their ``evaluate`` method.
+
+    Args:
+        node (Node): The root node of the AST.
+
+    Returns:
+        Callable[[dict], bool]: A function evaluating the rule against data.
+
+    Raises:
+        ValueError: If the AST contains an unsupported operator.
+    """
+    if node is None:
+        return lambda data: True
+    conditions = []
+    source = _node_to_source(node, conditions, _data_reference)
+    return _compile_function(
+        _FUNCTION_TEMPLATE.format(source=source),
+        conditions,
+        interpreter(AST(node))
+    )
+
+def compile_ast_batch(node: Node) -> Callable[[Dict[str, list], int], List[bool]]:
+    """
+    Compile an AST into a function evaluating the rule over columns of data.
+
+    The rule expression is emitted inside a single list comprehension that
+    zips the referenced columns together, so rows are evaluated without a
+    Python function call each.
+
+    Args:
+        node (Node): The root node of the AST.
+
+    Returns:
+        Callable[[Dict[str, list], int], List[bool]]: A function taking the
+        columns and the number of rows, returning one result per row.
+
+    Raises:
+        ValueError: If the AST contains an unsupported operator.
+    """
+    conditions = []
+    variables = {}
+    if node is None:
+        return lambda columns, size: [True] * size
+    source = _node_to_source(
+        node, conditions, lambda name: variables.setdefault(name, f'_v{len(variables)}')
+    )
+    targets = ''.join(f'{local},' for local in variables.values())
+    # A missing column reads as a missing variable on every row.
+    iterables = ', '.join(
+        f'columns.get({name!r}) or _repeat(_MISSING, size)' for name in variables
+    )
+    return _compile_function(
+        _BATCH_TEMPLATE.format(source=source, targets=targets, iterables=iterables),
+        conditions,
+        _interpret_rows(AST(node))
+    )
+
+def compile_batch(ast: AST) -> Callable[[Dict[str, list], int], List[bool]]:
+    """
+    Compile a rule for batch evaluation, falling back to per-row evaluation.
+
+    Args:
+        ast (AST): The AST of the rule.
+
+    Returns:
+        Callable[[Dict[str, list], int], List[bool]]: The batch evaluator.
+    """
+    try:
+        return compile_ast_batch(ast.root)
+    except (ValueError, RecursionError, SyntaxError, MemoryError):
+        return _interpret_rows(ast)
+
+def interpreter(ast: AST) -> Callable[[dict], bool]:
+    """
+    Return the fastest interpreting evaluator available for an AST.
+
+    Args:
+        ast (AST): The AST of the rule.
+
+    Returns:
+        Callable[[dict], bool]: The flattened AST's evaluator, or the AST's
+        own evaluator if it cannot be flattened.
+    """
+    try:
+        return ast.flatten().evaluate
+    except ValueError:
+        return ast.evaluate_rule
+
+def _interpret_rows(ast: AST) -> Callable[[Dict[str, list], int], List[bool]]:
+    """
+    Return a batch evaluator interpreting the rule once per row.
+
+    Args:
+        ast (AST): The AST of the rule.
+
+    Returns:
+        Callable[[Dict[str, list], int], List[bool]]: The batch evaluator.
+    """
+    interpret = interpreter(ast)
+
+    def evaluate(columns, size):
+        names = list(columns)
+        rows = zip(*columns.values()) if names else [()] * size
+        return [interpret(dict(zip(names, row))) for row in rows]
+    return evaluate
+
+def inline_source(node: Node) -> Optional[str]:
+    """
+    Emit the expression of a rule when every condition can be inlined.
+
+    The expression reads variables from ``data`` and otherwise references
+    only ``_MISSING``, which must be bound to ``ast_utils.MISSING``, so it
+    can be compiled outside of this module. Like the compiled evaluators,
+    it raises TypeError where the interpreter treats a comparison as false.
+
+    Args:
+        node (Node): The root node of the AST.
+
+    Returns:
+        Optional[str]: The Python expression of the rule, or None if some
+        condition or operator cannot be inlined.
+    """
+    conditions = []
+    try:
+        source = _node_to_source(node, conditions, _data_reference)
+    except (ValueError, RecursionError):
+        return None
+    return None if conditions else source
+
+def _compile_function(source: str, conditions: List[Condition], fallback: Callable) -> Callable:
+    """
+    Compile the source of an evaluator defining ``evaluate``.
+
+    Args:
+        source (str): The source of the function.
+        conditions (List[Condition]): Conditions referenced by the source.
+        fallback (Callable): The evaluator used when the source raises.
+
+    Returns:
+        Callable: The compiled function.
+    """
+    namespace = {
+        '_conditions': conditions,
+        '_fallback': fallback,
+        '_MISSING': MISSING,
+        '_repeat': repeat,
+    }
+    exec(compile(source, '<rule>', 'exec'), namespace)
+    return namespace['evaluate']
+
+def _data_reference(name: str) -> str:
+    """Return the source reading a variable from ``data``."""
+    return f'data.get({name!r}, _MISSING)'
+
+def _node_to_source(node: Node, conditions: List[Condition], reference: Callable[[str], str]) -> str:
+    """
+    Emit the Python source of the boolean expression for an AST node.
+
+    Args:
+        node (Node): The AST node.
+        conditions (List[Condition]): Conditions referenced by the emitted
+            source through ``_conditions``, appended to as needed.
+        reference (Callable[[str], str]): Maps a variable name to the source
+            expression reading its value.
+
+    Returns:
+        str: The Python expression for the node.
+    """
+    if node.node_type == 'operand':
+        condition = node.value
+        lvalue = reference(condition.lvariable)
+        comparator = _SOURCE_COMPARATORS.get(condition.comparison_type)
+        if comparator is not None and _is_literal(condition.rvalue):
+            if comparator == '!=':
+                # Conditions on a missing variable are false, even '!='.
+                return f'((_v := {lvalue}) is not _MISSING and _v != {condition.rvalue!r})'
+            return f'({lvalue} {comparator} {condition.rvalue!r})'
+        conditions.append(condition)
+        return f'_conditions[{len(conditions) - 1}].evaluate({lvalue})'
+    if isinstance(node.value, ANDOperator):
+        keyword = 'and'
+    elif isinstance(node.value, OROperator):
+        keyword = 'or'
+    else:
+        raise ValueError(f"Unsupported operator: {node.value!r}")
+    left = _node_to_source(node.left, conditions, reference)
+    right = _node_to_source(node.right, conditions, reference)
+    return f'({left} {keyword} {right})'
+
+def _is_literal(value) -> bool:
+    """Return whether a value round-trips through its repr as a literal."""
+    if type(value) is float:
+        return value == value and value not in (float('inf'), float('-inf'))
+    return type(value) in (int, str)
@@ -20,10 +20,10 @@ def get_rule(db: Session, rule_id: int) -> Rule:
     Returns:
         Rule: The retrieved rule object.
     """
-    return db.query(Rule).filter(Rule.id == rule_id).first()
+    return db.get(Rule, rule_id)
 
 
-def create_rule(db: Session, rule_name: str, ast_json: str) -> Rule:
+def create_rule(db: Session, rule_name: str, ast_json: str, hot: bool = False) -> Rule:
     """
     Create a new rule in the database.
 
@@ -31,12 +31,32 @@ def create_rule(db: Session, rule_name: str, ast_json: str) -> Rule:
         db (Session): The database session.
         rule_name (str): The name of the rule.
         ast_json (str): The JSON representation of the AST for the rule.
+        hot (bool): Whether the rule is compiled to a native evaluator.
 
     Returns:
         Rule: The created rule object.
     """
-    db_rule = Rule(name=rule_name, ast_json=ast_json)
+    db_rule = Rule(name=rule_name, ast_json=ast_json, hot=hot)
     db.add(db_rule)
     db.commit()
     db.refresh(db_rule)
     return db_rule
+
+
+def update_rule(db: Session, db_rule: Rule, ast_json: str) -> Rule:
+    """
+    Replace the AST of a rule in the database and bump its version.
+
+    Args:
+        db (Session): The database session.
+        db_rule (Rule): The rule object to update.
+        ast_json (str): The new JSON representation of the AST for the rule.
+
+    Returns:
+        Rule: The updated rule object.
+    """
+    db_rule.ast_json = ast_json
+    db_rule.version = Rule.version + 1
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
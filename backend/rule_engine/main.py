@@ -4,38 +4,84 @@ FastAPI application for the rule engine.
 This module provides API endpoints for creating, combining, and evaluating rules.
 """
 
-import json
-from typing import Dict, List
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import JSONResponse
+import itertools
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from cachetools import LFUCache, LRUCache
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from rule_engine import models, database
+from rule_engine import models, database, native
 from rule_engine.parser_utils import Parser, tokenize
-from rule_engine.ast_utils import ANDOperator, Condition, Node, AST, OROperator
+from rule_engine.ast_utils import ConditionStats, Node, AST, combine_balanced
+from rule_engine.compiler import compile_ast, compile_batch, inline_source, interpreter
+from rule_engine.serialization import data_cache_key, json_to_ast, parse_evaluate_payload, root_to_json
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Upper bound on memoized (rule, data) evaluation results.
+EVAL_CACHE_SIZE = 10_000
+
+# Upper bound on rules kept parsed and compiled in memory.
+RULE_CACHE_SIZE = 1024
+
+# One in this many uncached evaluations records condition statistics.
+STATS_SAMPLE_INTERVAL = 100
+
+# Sampled evaluations of a rule after which its AST is reordered.
+REORDER_SAMPLES = 1000
+
+# Parsed ASTs and their compiled evaluators keyed by rule ID, stored with the
+# rule version they were built from. A stored rule only changes when it is
+# reordered, which never changes its result for any data, so a cached rule
+# is served without querying the database even if another worker reordered
+# it since.
+_RULE_CACHE: LFUCache = LFUCache(maxsize=RULE_CACHE_SIZE)
+
+# Column-wise evaluators keyed by rule ID, built lazily on the first batch call.
+_BATCH_CACHE: LFUCache = LFUCache(maxsize=RULE_CACHE_SIZE)
+
+# Evaluation results keyed by rule ID, rule version and canonical data.
+_EVAL_CACHE: LRUCache = LRUCache(maxsize=EVAL_CACHE_SIZE)
+
+# cachetools caches are not thread-safe, and sync endpoints run in a threadpool.
+_CACHE_LOCK = threading.Lock()
+
+# Marks a missing entry in the evaluation result cache.
+_MISSING = object()
+
+# Condition true-rates observed in sampled evaluations, shared by all rules.
+_CONDITION_STATS = ConditionStats()
+_EVAL_COUNTER = itertools.count()
+_RULE_SAMPLES: Dict[int, int] = {}
 
 class RuleString(BaseModel):
     """Pydantic model for a rule string."""
     rule: str
     name: str
+    hot: bool = False
 
 class RuleList(BaseModel):
     """Pydantic model for a list of rule strings."""
     rules: List[str]
 
-class EvaluateRequest(BaseModel):
-    """Pydantic model for an evaluation request."""
+class EvaluateBatchRequest(BaseModel):
+    """Pydantic model for a batch evaluation request."""
     rule_id: int
-    data: Dict
+    columns: Dict[str, List]
 
 class ASTNode(BaseModel):
-    """Pydantic model for an AST node."""
+    """
+    Pydantic model for an AST node.
+
+    Operands hold their condition's fields as ``value``, and operators hold
+    their name, such as ``'AND'``.
+    """
     node_type: str
-    left: Dict = None
-    right: Dict = None
-    value: Dict = None
+    left: Optional[Dict] = None
+    right: Optional[Dict] = None
+    value: Union[str, Dict]
 
 def get_db():
     """
@@ -50,13 +96,36 @@ def get_db():
     finally:
         db.close()
 
+async def evaluate_payload(request: Request) -> Tuple[int, dict]:
+    """
+    Dependency parsing the body of an evaluation request.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        Tuple[int, dict]: The rule ID and the data to evaluate.
+
+    Raises:
+        HTTPException: If the body is not a valid evaluation request.
+    """
+    try:
+        return parse_evaluate_payload(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/create_rule", response_model=ASTNode)
-def create_rule(rule_string: RuleString, db: Session = Depends(get_db)):
+def create_rule(
+    rule_string: RuleString,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Create a new rule and store it in the database.
 
     Args:
         rule_string (RuleString): The rule string and name.
+        background_tasks (BackgroundTasks): Tasks run after the response.
         db (Session): The database session.
 
     Returns:
@@ -67,8 +136,11 @@ def create_rule(rule_string: RuleString, db: Session = Depends(get_db)):
     try:
         root = parser.parse()
         ast_json = root_to_json(root)
-        database.create_rule(db, rule_string.name, ast_json)
-        return JSONResponse(ast_json)
+        db_rule = database.create_rule(db, rule_string.name, ast_json, rule_string.hot)
+        _cache_rule(db_rule.id, db_rule.version, AST(root))
+        if db_rule.hot:
+            background_tasks.add_task(_build_native, db_rule.id, db_rule.version)
+        return Response(content=ast_json, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -83,97 +155,261 @@ def combine_rules(rule_list: RuleList):
     Returns:
         ASTNode: The root node of the combined AST.
     """
-    combined_root = None
-    for rule in rule_list.rules:
-        tokens = tokenize(rule)
-        parser = Parser(tokens)
-        root = parser.parse()
-        if combined_root is None:
-            combined_root = root
-        else:
-            combined_root = Node(
-                node_type="operator",
-                left=combined_root,
-                right=root,
-                value=ANDOperator()
-            )
-    return JSONResponse(root_to_json(combined_root))
+    combined_root = combine_balanced(list(map(_parse_one, rule_list.rules)))
+    ast_json = root_to_json(combined_root) or "null"
+    return Response(content=ast_json, media_type="application/json")
+
+def _parse_one(rule: str) -> Node:
+    """
+    Tokenize and parse a single rule string.
+
+    Args:
+        rule (str): The rule string.
+
+    Returns:
+        Node: The root node of the rule's AST.
+    """
+    return Parser(tokenize(rule)).parse()
 
 @app.post("/evaluate_rule")
-def evaluate_rule(request: EvaluateRequest, db: Session = Depends(get_db)):
+def evaluate_rule(
+    background_tasks: BackgroundTasks,
+    payload: Tuple[int, dict] = Depends(evaluate_payload),
+    db: Session = Depends(get_db)
+):
     """
     Evaluate a rule against provided data.
 
     Args:
-        request (EvaluateRequest): The evaluation request containing rule ID and data.
+        background_tasks (BackgroundTasks): Tasks run after the response.
+        payload (Tuple[int, dict]): The rule ID and data from the request body.
         db (Session): The database session.
 
     Returns:
         Dict: The evaluation result.
     """
-    db_rule = database.get_rule(db, request.rule_id)
-    if db_rule is None:
-        raise HTTPException(status_code=404, detail="Rule not found")
-    ast = json_to_ast(db_rule.ast_json)
-    result = ast.evaluate_rule(request.data)
+    rule_id, data = payload
+    cached = _load_rule(db, rule_id, background_tasks)
+    data_key = data_cache_key(data)
+    if data_key is None:
+        # Data that cannot be encoded as a key is evaluated without memoizing.
+        result = cached[2](data)
+    else:
+        result = _cached_eval(rule_id, cached, data_key, data)
+    if _claim_reorder(rule_id):
+        background_tasks.add_task(_reorder_rule, rule_id)
     return {"result": result}
 
-def root_to_json(root: Node) -> str:
+@app.post("/evaluate_rule_batch")
+def evaluate_rule_batch(
+    request: EvaluateBatchRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
-    Convert an AST root node to JSON.
+    Evaluate a rule against many rows of data given as columns.
 
     Args:
-        root (Node): The root node of the AST.
+        request (EvaluateBatchRequest): The evaluation request containing rule
+            ID and one list of values per variable.
+        background_tasks (BackgroundTasks): Tasks run after the response.
+        db (Session): The database session.
 
     Returns:
-        str: The JSON representation of the AST.
+        Dict: The evaluation result for each row.
     """
-    if root is None:
-        return ""
-    return json.dumps(root, default=lambda o: o.__dict__)
+    version, ast, _ = _load_rule(db, request.rule_id, background_tasks)
+    sizes = {len(values) for values in request.columns.values()}
+    if len(sizes) > 1:
+        raise HTTPException(status_code=400, detail="Columns must have the same length")
+    size = sizes.pop() if sizes else 0
+    with _CACHE_LOCK:
+        cached = _BATCH_CACHE.get(request.rule_id)
+    if cached is None or cached[0] != version:
+        cached = (version, compile_batch(ast))
+        with _CACHE_LOCK:
+            _BATCH_CACHE[request.rule_id] = cached
+    return {"results": cached[1](request.columns, size)}
 
-def json_to_ast(json_str: str) -> AST:
+def _load_rule(
+    db: Session,
+    rule_id: int,
+    background_tasks: BackgroundTasks = None
+) -> Tuple[int, AST, Callable[[dict], bool]]:
     """
-    Convert a JSON string to an AST.
+    Return the cached entry for a rule.
+
+    The database is only queried on a cache miss, when the rule's row is
+    fetched and deserialized.
 
     Args:
-        json_str (str): The JSON string representing the AST.
+        db (Session): The database session.
+        rule_id (int): The ID of the rule.
+        background_tasks (BackgroundTasks, optional): Used to build a native
+            evaluator for hot rules on a cache miss.
 
     Returns:
-        AST: The AST object.
+        Tuple[int, AST, Callable[[dict], bool]]: The cached entry.
+
+    Raises:
+        HTTPException: If the rule does not exist.
     """
-    data = json.loads(json_str)
-    root = dict_to_node(data)
-    return AST(root)
+    cached = _get_cached_rule(rule_id)
+    if cached is None:
+        db_rule = database.get_rule(db, rule_id)
+        if db_rule is None:
+            raise HTTPException(status_code=404, detail="Rule not found")
+        cached = _cache_rule(db_rule.id, db_rule.version, json_to_ast(db_rule.ast_json))
+        if db_rule.hot and background_tasks is not None:
+            background_tasks.add_task(_build_native, db_rule.id, db_rule.version)
+    return cached
 
-def dict_to_node(data: dict) -> Node:
+def _get_cached_rule(rule_id: int) -> Optional[Tuple[int, AST, Callable[[dict], bool]]]:
     """
-    Convert a dictionary to an AST node.
+    Look up a rule in the rule cache.
 
     Args:
-        data (dict): The dictionary representing the node.
+        rule_id (int): The ID of the rule.
 
     Returns:
-        Node: The AST node.
-    """
-    if data is None:
-        return None
-    node = Node(node_type=data['node_type'])
-    node.left = dict_to_node(data.get('left'))
-    node.right = dict_to_node(data.get('right'))
-    if data['node_type'] == 'operand':
-        node.value = Condition(
-            lvariable=data['value']['lvariable'],
-            rvalue=data['value']['rvalue'],
-            comparison_type=data['value']['comparison_type']
-        )
+        Optional[Tuple[int, AST, Callable[[dict], bool]]]: The cached entry,
+        or None if the rule is not cached.
+    """
+    with _CACHE_LOCK:
+        return _RULE_CACHE.get(rule_id)
+
+def _build_native(rule_id: int, version: int) -> None:
+    """
+    Replace a cached rule's evaluator with a natively compiled one.
+
+    Nothing changes if the rule cannot be compiled natively, or if the
+    cached entry moved to another version meanwhile.
+
+    Args:
+        rule_id (int): The ID of the rule.
+        version (int): The version of the rule's AST.
+    """
+    cached = _get_cached_rule(rule_id)
+    if cached is None or cached[0] != version or cached[1].root is None:
+        return
+    # Conditions that are not inlined cannot be referenced from native code.
+    source = inline_source(cached[1].root)
+    if source is None:
+        return
+    evaluate = native.build_evaluator(source, interpreter(cached[1]))
+    if evaluate is None:
+        return
+    with _CACHE_LOCK:
+        cached = _RULE_CACHE.get(rule_id)
+        if cached is not None and cached[0] == version:
+            _RULE_CACHE[rule_id] = (version, cached[1], evaluate)
+
+def _cache_rule(rule_id: int, version: int, ast: AST) -> Tuple[int, AST, Callable[[dict], bool]]:
+    """
+    Compile a rule's AST and store it in the rule cache.
+
+    Rules that cannot be compiled are evaluated from their flattened form.
+
+    Args:
+        rule_id (int): The ID of the rule.
+        version (int): The version of the rule's AST.
+        ast (AST): The AST of the rule.
+
+    Returns:
+        Tuple[int, AST, Callable[[dict], bool]]: The cached entry.
+    """
+    try:
+        evaluate = compile_ast(ast.root)
+    except (ValueError, RecursionError, SyntaxError, MemoryError):
+        evaluate = interpreter(ast)
+    cached = (version, ast, evaluate)
+    with _CACHE_LOCK:
+        _RULE_CACHE[rule_id] = cached
+    return cached
+
+def _cached_eval(
+    rule_id: int,
+    cached: Tuple[int, AST, Callable[[dict], bool]],
+    data_key: bytes,
+    data: dict
+) -> bool:
+    """
+    Evaluate a cached rule against canonicalized data, memoizing the result.
+
+    The rule version is part of the result key, so bumping it invalidates
+    every result computed against the previous AST.
+
+    Args:
+        rule_id (int): The ID of the rule.
+        cached (Tuple[int, AST, Callable[[dict], bool]]): The rule's entry in
+            the rule cache.
+        data_key (bytes): The canonical JSON encoding of the input data.
+        data (dict): The input data.
+
+    Returns:
+        bool: The evaluation result.
+    """
+    version, ast, evaluate = cached
+    key = (rule_id, version, data_key)
+    with _CACHE_LOCK:
+        result = _EVAL_CACHE.get(key, _MISSING)
+    if result is not _MISSING:
+        return result
+
+    if next(_EVAL_COUNTER) % STATS_SAMPLE_INTERVAL == 0:
+        with _CACHE_LOCK:
+            _RULE_SAMPLES[rule_id] = _RULE_SAMPLES.get(rule_id, 0) + 1
+        result = ast.evaluate_iter(data, _CONDITION_STATS)
     else:
-        operator = data['value']
-        if operator == 'ANDOperator':
-            node.value = ANDOperator()
-        elif operator == 'OROperator':
-            node.value = OROperator()
-    return node
+        result = evaluate(data)
+    with _CACHE_LOCK:
+        _EVAL_CACHE[key] = result
+    return result
+
+def _claim_reorder(rule_id: int) -> bool:
+    """
+    Check whether a rule has enough samples to be reordered.
+
+    The sample count is reset by the caller that reaches the threshold, so
+    concurrent requests schedule a single reorder.
+
+    Args:
+        rule_id (int): The ID of the rule.
+
+    Returns:
+        bool: True if the caller should reorder the rule.
+    """
+    with _CACHE_LOCK:
+        if _RULE_SAMPLES.get(rule_id, 0) < REORDER_SAMPLES:
+            return False
+        _RULE_SAMPLES[rule_id] = 0
+        return True
+
+def _reorder_rule(rule_id: int) -> None:
+    """
+    Reorder a rule's AST by observed condition true-rates and persist it.
+
+    Runs as a background task with its own database session. Evaluation
+    never raises, so the reordered AST gives the same result as the stored
+    one for any data. It is built from a fresh copy, so evaluations running
+    on the cached AST are not affected.
+
+    Args:
+        rule_id (int): The ID of the rule.
+    """
+    db = models.SessionLocal()
+    try:
+        db_rule = database.get_rule(db, rule_id)
+        if db_rule is None:
+            return
+        ast = json_to_ast(db_rule.ast_json)
+        if ast.reorder(_CONDITION_STATS):
+            db_rule = database.update_rule(db, db_rule, root_to_json(ast.root))
+            _cache_rule(db_rule.id, db_rule.version, ast)
+            if db_rule.hot:
+                _build_native(db_rule.id, db_rule.version)
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -6,7 +6,7 @@ This module defines the Rule model and sets up the database connection.
 
 import os
 from dotenv import load_dotenv
-from sqlalchemy import Column, Integer, String, Text, create_engine
+from sqlalchemy import Boolean, Column, Integer, String, Text, create_engine, false, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -28,12 +28,16 @@ class Rule(Base):
         id (int): Primary key.
         name (str): Name of the rule.
         ast_json (str): JSON representation of the AST.
+        version (int): Revision counter, bumped whenever ``ast_json`` changes.
+        hot (bool): Whether the rule is compiled to a native evaluator.
     """
     __tablename__ = "rules"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     ast_json = Column(Text, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    hot = Column(Boolean, nullable=False, default=False, server_default=false())
 
 # Create the database engine
 engine = create_engine(DATABASE_URL)
@@ -43,3 +47,17 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create all tables in the database
 Base.metadata.create_all(bind=engine)
+
+# Columns added to the rules table after it was first released. create_all
+# never alters an existing table, so databases created before these columns
+# existed are brought up to date with these statements.
+MIGRATIONS = [
+    "ALTER TABLE rules ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE rules ADD COLUMN IF NOT EXISTS hot BOOLEAN NOT NULL DEFAULT FALSE",
+]
+
+def migrate():
+    """Apply MIGRATIONS to the database in a single transaction."""
+    with engine.begin() as connection:
+        for statement in MIGRATIONS:
+            connection.execute(text(statement))
@@ -0,0 +1,129 @@
+"""
+Native compilation of rule expressions with Cython.
+
+This module turns the boolean expression emitted for a rule into a Cython
+extension module, so hot rules can be evaluated without going through the
+CPython bytecode interpreter.
+"""
+
+import atexit
+import hashlib
+import importlib.machinery
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import Callable, Dict, Optional
+
+# Extensions are built in a directory private to this process, created on the
+# first build and removed at exit. Only extensions built here are loaded, so
+# files planted by other users are never imported.
+_build_dir: Optional[str] = None
+
+# Paths of the extensions built by this process, keyed by module name. Failed
+# builds are recorded as None so they are not retried.
+_BUILT: Dict[str, Optional[str]] = {}
+
+_BUILD_LOCK = threading.Lock()
+
+_PYX_TEMPLATE = """\
+from rule_engine.ast_utils import MISSING as _MISSING
+
+fallback = None
+
+def evaluate(dict data):
+    try:
+        return {source}
+    except TypeError:
+        return fallback(data)
+"""
+
+
+def build_evaluator(
+    source: str,
+    fallback: Callable[[dict], bool]
+) -> Optional[Callable[[dict], bool]]:
+    """
+    Build a native function evaluating a rule expression.
+
+    Args:
+        source (str): The Python expression of the rule, as emitted by
+            ``compiler.inline_source``.
+        fallback (Callable[[dict], bool]): Evaluates the rule when the
+            expression raises TypeError.
+
+    Returns:
+        Optional[Callable[[dict], bool]]: The native evaluator, or None if
+        Cython is not installed or the build failed.
+    """
+    if importlib.util.find_spec("Cython") is None:
+        return None
+
+    pyx = _PYX_TEMPLATE.format(source=source)
+    module_name = f"rule_{hashlib.sha1(pyx.encode()).hexdigest()}"
+    with _BUILD_LOCK:
+        if module_name not in _BUILT:
+            _BUILT[module_name] = _build_extension(module_name, pyx)
+        path = _BUILT[module_name]
+    if path is None:
+        return None
+
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.fallback = fallback
+    return module.evaluate
+
+
+def _build_extension(module_name: str, pyx: str) -> Optional[str]:
+    """
+    Compile a Cython module in the private build directory.
+
+    Cython runs under this interpreter, so the extension is built for it.
+
+    Args:
+        module_name (str): The name of the module.
+        pyx (str): The Cython source of the module.
+
+    Returns:
+        Optional[str]: The path of the built extension, or None if the build
+        failed.
+    """
+    global _build_dir
+    if _build_dir is None:
+        # mkdtemp creates a new directory readable only by its owner.
+        _build_dir = tempfile.mkdtemp(prefix="rule_engine_native_")
+        atexit.register(shutil.rmtree, _build_dir, ignore_errors=True)
+
+    pyx_path = os.path.join(_build_dir, f"{module_name}.pyx")
+    with open(pyx_path, "w", encoding="utf-8") as pyx_file:
+        pyx_file.write(pyx)
+    result = subprocess.run(
+        [sys.executable, "-m", "Cython.Build.Cythonize", "-3", "-i", pyx_path],
+        cwd=_build_dir,
+        capture_output=True,
+        check=False
+    )
+    if result.returncode != 0:
+        return None
+    return _find_extension(module_name)
+
+
+def _find_extension(module_name: str) -> Optional[str]:
+    """
+    Find the built extension file of a module in the build directory.
+
+    Args:
+        module_name (str): The name of the module.
+
+    Returns:
+        Optional[str]: The path of the extension, or None if it is not built.
+    """
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        path = os.path.join(_build_dir, module_name + suffix)
+        if os.path.exists(path):
+            return path
+    return None
@@ -7,7 +7,11 @@ parsing them into abstract syntax trees (ASTs).
 
 import re
 from typing import List
-from rule_engine.ast_utils import Node, ANDOperator, OROperator, Condition
+from rule_engine.ast_utils import Node, AND_OPERATOR, OR_OPERATOR, Condition
+
+# Quoted string literals are captured without their quotes; every other token
+# is captured whole. Characters matching neither alternative are skipped.
+_TOKEN_RE = re.compile(r"'([^']*)'|(=>|<=|>=|!=|==|&&|\|\||[()=><!]|\d+\.\d+|\w+)")
 
 def tokenize(rule: str) -> List[str]:
     """
@@ -19,8 +23,7 @@ def tokenize(rule: str) -> List[str]:
     Returns:
         List[str]: A list of tokens.
     """
-    token_pattern = re.compile(r'\s*(=>|<=|>=|&&|\|\||[()=><!]|[\w]+)\s*')
-    return [token for token in token_pattern.findall(rule) if token.strip()]
+    return [match.group(match.lastindex) for match in _TOKEN_RE.finditer(rule)]
 
 class Parser:
     """
@@ -61,9 +64,9 @@ class Parser:
             self.pos += 1
             right = self.parse_term()
             if operator == 'AND':
-                node = Node("operator", left=node, right=right, value=ANDOperator())
+                node = Node("operator", left=node, right=right, value=AND_OPERATOR)
             elif operator == 'OR':
-                node = Node("operator", left=node, right=right, value=OROperator())
+                node = Node("operator", left=node, right=right, value=OR_OPERATOR)
         return node
 
     def parse_term(self) -> Node:
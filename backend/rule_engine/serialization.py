@@ -0,0 +1,201 @@
+"""
+Serialization of rule ASTs.
+
+This module converts ASTs to and from the JSON stored in the database, and
+decodes the bodies of evaluation requests.
+"""
+
+import json
+import sys
+from functools import lru_cache
+from typing import Optional, Tuple
+import orjson
+from rule_engine.ast_utils import AND_OPERATOR, OR_OPERATOR, ANDOperator, AST, Condition, Node, OROperator
+
+# Upper bound on distinct conditions shared between deserialized ASTs.
+CONDITION_CACHE_SIZE = 4096
+
+# Operator names stored in serialized ASTs. Class names are still accepted
+# when reading ASTs stored before the short names were introduced.
+_OPERATOR_NAMES = {ANDOperator: 'AND', OROperator: 'OR'}
+_OPERATORS = {
+    'AND': AND_OPERATOR,
+    'OR': OR_OPERATOR,
+    'ANDOperator': AND_OPERATOR,
+    'OROperator': OR_OPERATOR,
+}
+
+def root_to_json(root: Node) -> str:
+    """
+    Convert an AST root node to JSON.
+
+    orjson refuses to encode more than 254 levels of nesting, which long
+    chains of conditions exceed, so those are encoded with the json module.
+
+    Args:
+        root (Node): The root node of the AST.
+
+    Returns:
+        str: The JSON representation of the AST.
+    """
+    if root is None:
+        return ""
+    tree = _node_to_dict(root)
+    try:
+        return orjson.dumps(tree).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(tree, separators=(',', ':'))
+
+def _node_to_dict(node: Node) -> dict:
+    """
+    Convert an AST node to a plain dictionary.
+
+    Operands store their condition's fields, and operators store their short
+    name, such as ``'AND'``.
+
+    Args:
+        node (Node): The AST node.
+
+    Returns:
+        dict: The dictionary representing the node.
+    """
+    if node is None:
+        return None
+    if node.node_type == 'operand':
+        value = {
+            'lvariable': node.value.lvariable,
+            'rvalue': node.value.rvalue,
+            'comparison_type': node.value.comparison_type
+        }
+    else:
+        value = _OPERATOR_NAMES.get(type(node.value), type(node.value).__name__)
+    return {
+        'node_type': node.node_type,
+        'left': _node_to_dict(node.left),
+        'right': _node_to_dict(node.right),
+        'value': value
+    }
+
+def json_to_ast(json_str: str) -> AST:
+    """
+    Convert a JSON string to an AST.
+
+    Args:
+        json_str (str): The JSON string representing the AST.
+
+    Returns:
+        AST: The AST object.
+    """
+    data = orjson.loads(json_str)
+    root = dict_to_node(data)
+    return AST(root)
+
+def dict_to_node(data: dict) -> Node:
+    """
+    Convert a dictionary to an AST node.
+
+    The tree is rebuilt iteratively: a first pass collects the dictionaries
+    in pre-order, and a second pass walks them in reverse so that every
+    child node exists before its parent is built.
+
+    Args:
+        data (dict): The dictionary representing the node.
+
+    Returns:
+        Node: The AST node.
+    """
+    if data is None:
+        return None
+
+    ordered = []
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        ordered.append(item)
+        for child in (item.get('left'), item.get('right')):
+            if child is not None:
+                stack.append(child)
+
+    nodes = {}
+    for item in reversed(ordered):
+        node = Node(node_type=sys.intern(item['node_type']))
+        left = item.get('left')
+        right = item.get('right')
+        node.left = nodes[id(left)] if left is not None else None
+        node.right = nodes[id(right)] if right is not None else None
+        if node.node_type == 'operand':
+            node.value = _mk_cond(
+                item['value']['lvariable'],
+                item['value']['rvalue'],
+                item['value']['comparison_type']
+            )
+        else:
+            operator = item['value']
+            if isinstance(operator, str):
+                node.value = _OPERATORS.get(operator)
+        nodes[id(item)] = node
+    return nodes[id(data)]
+
+@lru_cache(maxsize=CONDITION_CACHE_SIZE, typed=True)
+def _mk_cond(lvariable: str, rvalue, comparison_type: str) -> Condition:
+    """
+    Return a shared Condition instance for the given values.
+
+    Conditions are never mutated once built, so identical conditions across
+    rules and requests can be the same object.
+
+    Args:
+        lvariable (str): The name of the variable to compare.
+        rvalue: The value to compare against.
+        comparison_type (str): The comparison type.
+
+    Returns:
+        Condition: The shared condition.
+    """
+    return Condition(lvariable, rvalue, comparison_type)
+
+def data_cache_key(data: dict) -> Optional[bytes]:
+    """
+    Return the canonical JSON encoding of evaluation data.
+
+    Args:
+        data (dict): The input data.
+
+    Returns:
+        Optional[bytes]: The encoding, with keys sorted, or None if orjson
+        cannot encode the data, such as when it is nested too deeply.
+    """
+    try:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        return None
+
+def parse_evaluate_payload(body: bytes) -> Tuple[int, dict]:
+    """
+    Decode and check the body of an evaluation request.
+
+    The body is decoded with orjson and checked by hand instead of through a
+    Pydantic model, which would validate and copy the whole data dict.
+
+    Args:
+        body (bytes): The raw request body.
+
+    Returns:
+        Tuple[int, dict]: The rule ID and the data to evaluate.
+
+    Raises:
+        ValueError: If the body is not a valid evaluation request.
+    """
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(str(e))
+    if not isinstance(payload, dict):
+        raise ValueError("Body must be a JSON object")
+    rule_id = payload.get('rule_id')
+    data = payload.get('data')
+    if type(rule_id) is not int:
+        raise ValueError("rule_id must be an integer")
+    if not isinstance(data, dict):
+        raise ValueError("data must be an object")
+    return rule_id, data
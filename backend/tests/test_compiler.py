@@ -0,0 +1,95 @@
+import unittest
+from rule_engine.parser_utils import tokenize, Parser
+from rule_engine.ast_utils import Node, AST, Condition, Operator, ANDOperator, OROperator
+from rule_engine.compiler import compile_ast, compile_ast_batch, compile_batch, inline_source
+
+def operand(lvariable, rvalue, comparison_type):
+    return Node("operand", value=Condition(lvariable, rvalue, comparison_type))
+
+class XOROperator(Operator):
+    def evaluate(self, left, right, data):
+        return left.evaluate(data) != right.evaluate(data)
+
+class TestCompiler(unittest.TestCase):
+    def setUp(self):
+        # (age > 30 AND department = 'Sales') OR salary > 50000
+        self.root = Node(
+            "operator",
+            left=Node(
+                "operator",
+                left=operand("age", 30, 'gt'),
+                right=operand("department", "Sales", 'eq'),
+                value=ANDOperator()
+            ),
+            right=operand("salary", 50000, 'gt'),
+            value=OROperator()
+        )
+        self.rows = [
+            {"age": 35, "department": "Sales", "salary": 0},
+            {"age": 35, "department": "HR", "salary": 60000},
+            {"age": 25, "department": "Sales", "salary": 40000},
+        ]
+
+    def test_compile_ast(self):
+        evaluate = compile_ast(self.root)
+        ast = AST(self.root)
+        for row in self.rows:
+            self.assertEqual(evaluate(row), ast.evaluate_rule(row))
+        self.assertTrue(compile_ast(None)({}))
+
+    def test_compile_parsed_rule(self):
+        rule = "((age > 30 AND department = 'Sales') OR (age < 25 AND department = 'Marketing')) AND (salary >= 50000 OR experience != 5)"
+        root = Parser(tokenize(rule)).parse()
+        # Every parsed comparison is inlined, none goes through _conditions.
+        source = inline_source(root)
+        self.assertIsNotNone(source)
+        self.assertNotIn('_conditions', source)
+
+        evaluate = compile_ast(root)
+        ast = AST(root)
+        rows = [
+            {"age": 35, "department": "Sales", "salary": 50000, "experience": 5},
+            {"age": 22, "department": "Marketing", "salary": 40000, "experience": 3},
+            {"age": 22, "department": "Sales", "salary": 60000, "experience": 3},
+            {"age": 40, "department": "Sales", "salary": 40000, "experience": 5},
+        ]
+        self.assertEqual([evaluate(row) for row in rows], [True, True, False, False])
+        self.assertEqual([evaluate(row) for row in rows], [ast.evaluate_rule(row) for row in rows])
+
+    def test_compile_ast_missing_variable(self):
+        root = Node(
+            "operator",
+            left=operand("age", 30, 'gt'),
+            right=operand("vip", 1, 'ne'),
+            value=ANDOperator()
+        )
+        evaluate = compile_ast(root)
+        rows = [{"age": 35}, {"vip": 0}, {"age": "35", "vip": 0}, {"age": 35, "vip": 0}, {}]
+        self.assertEqual([evaluate(row) for row in rows], [False, False, False, True, False])
+
+        evaluate = compile_ast_batch(root)
+        self.assertEqual(evaluate({"age": [35, "35", None, 20]}, 4), [False] * 4)
+        self.assertEqual(evaluate({"age": [35, "35"], "vip": [0, 0]}, 2), [True, False])
+
+    def test_compile_ast_batch(self):
+        evaluate = compile_ast_batch(self.root)
+        columns = {name: [row[name] for row in self.rows] for name in self.rows[0]}
+        self.assertEqual(evaluate(columns, len(self.rows)), [True, True, False])
+        self.assertEqual(compile_ast_batch(None)({}, 2), [True, True])
+
+    def test_compile_batch_fallback(self):
+        root = Node("operator", left=operand("age", 30, 'gt'), right=operand("age", 40, 'lt'), value=XOROperator())
+        evaluate = compile_batch(AST(root))
+        self.assertEqual(evaluate({"age": [25, 35, 45]}, 3), [True, False, True])
+
+    def test_inline_source(self):
+        self.assertEqual(
+            inline_source(self.root),
+            "(((data.get('age', _MISSING) > 30) and (data.get('department', _MISSING) == 'Sales'))"
+            " or (data.get('salary', _MISSING) > 50000))"
+        )
+        self.assertIsNone(inline_source(operand("age", [30], 'eq')))
+        self.assertIsNone(inline_source(operand("age", 30, 'between')))
+
+if __name__ == '__main__':
+    unittest.main()
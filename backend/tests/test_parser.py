@@ -1,6 +1,6 @@
 import unittest
 from rule_engine.parser_utils import tokenize, Parser
-from rule_engine.ast_utils import Node, AST
+from rule_engine.ast_utils import Node, AST, AND_OPERATOR, OR_OPERATOR
 
 class TestParser(unittest.TestCase):
     def test_tokenizer(self):
@@ -11,6 +11,12 @@ class TestParser(unittest.TestCase):
         ]
         self.assertEqual(tokens, expected_tokens)
 
+    def test_tokenizer_literals(self):
+        rule = "city = 'New York' AND rating >= 4.5 AND tier != 'free'"
+        tokens = tokenize(rule)
+        expected_tokens = ['city', '=', 'New York', 'AND', 'rating', '>=', '4.5', 'AND', 'tier', '!=', 'free']
+        self.assertEqual(tokens, expected_tokens)
+
     def test_parser(self):
         rule = "((age > 30 AND department = 'Sales') OR (age < 25 AND department = 'Marketing')) AND (salary > 50000 OR experience > 5)"
         tokens = tokenize(rule)
@@ -18,15 +24,25 @@ class TestParser(unittest.TestCase):
         ast = parser.parse()
         self.assertIsInstance(ast, Node)
 
+    def test_parser_shared_operators(self):
+        root = Parser(tokenize("(age > 30 AND salary > 50000) OR experience > 5")).parse()
+        self.assertIs(root.value, OR_OPERATOR)
+        self.assertIs(root.left.value, AND_OPERATOR)
+
+        ast = AST()
+        ast.combine_rules(["age > 30 AND salary > 50000", "experience > 5 AND age < 60"])
+        self.assertIs(ast.root.value, AND_OPERATOR)
+        self.assertIs(ast.root.left.value, AND_OPERATOR)
+
     def test_ast_create_rule(self):
         rule = "((age > 30 AND department = 'Sales') OR (age < 25 AND department = 'Marketing')) OR (salary > 50000 OR experience > 5)"
         ast = AST()
         ast.create_rule(rule)
         json_data = {"age": 35, "department": "Sales", "salary": 60000, "experience": 3}
-        self.assertFalse(ast.evaluate_rule(json_data))
+        self.assertTrue(ast.evaluate_rule(json_data))
 
         json_data = {"age": 22, "department": "Sales", "salary": 45000, "experience": 6}
-        self.assertFalse(ast.evaluate_rule(json_data))
+        self.assertTrue(ast.evaluate_rule(json_data))
 
         json_data = {"age": 40, "department": "HR", "salary": 40000, "experience": 4}
         self.assertFalse(ast.evaluate_rule(json_data))
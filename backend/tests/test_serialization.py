@@ -0,0 +1,106 @@
+import unittest
+import orjson
+from rule_engine.parser_utils import tokenize, Parser
+from rule_engine.ast_utils import AND_OPERATOR, OR_OPERATOR, ANDOperator, OROperator
+from rule_engine.serialization import root_to_json, json_to_ast, dict_to_node, data_cache_key, parse_evaluate_payload
+
+def operand(lvariable, rvalue, comparison_type):
+    return {
+        'node_type': 'operand',
+        'left': None,
+        'right': None,
+        'value': {'lvariable': lvariable, 'rvalue': rvalue, 'comparison_type': comparison_type}
+    }
+
+def operator(name, left, right):
+    return {'node_type': 'operator', 'left': left, 'right': right, 'value': name}
+
+class TestSerialization(unittest.TestCase):
+    def test_round_trip(self):
+        rule = "(age > 30 AND department = 'Sales') OR salary >= 50000"
+        ast_json = root_to_json(Parser(tokenize(rule)).parse())
+        self.assertEqual(orjson.loads(ast_json)['value'], 'OR')
+        self.assertEqual(orjson.loads(ast_json)['left']['value'], 'AND')
+        self.assertEqual(root_to_json(json_to_ast(ast_json).root), ast_json)
+
+        ast = json_to_ast(ast_json)
+        self.assertTrue(ast.evaluate_rule({"age": 35, "department": "Sales", "salary": 0}))
+        self.assertTrue(ast.evaluate_rule({"age": 20, "department": "HR", "salary": 50000}))
+        self.assertFalse(ast.evaluate_rule({"age": 20, "department": "HR", "salary": 40000}))
+
+    def test_legacy_operator_names(self):
+        legacy = operator(
+            'OROperator',
+            operator('ANDOperator', operand('age', 30, 'gt'), operand('department', 'Sales', 'eq')),
+            operand('salary', 50000, 'gt')
+        )
+        ast = json_to_ast(orjson.dumps(legacy))
+        self.assertIs(ast.root.value, OR_OPERATOR)
+        self.assertIs(ast.root.left.value, AND_OPERATOR)
+        self.assertTrue(ast.evaluate_rule({"age": 35, "department": "Sales", "salary": 0}))
+        self.assertFalse(ast.evaluate_rule({"age": 35, "department": "HR", "salary": 0}))
+
+        # Legacy rows are rewritten with the short names.
+        ast_json = root_to_json(ast.root)
+        self.assertEqual(orjson.loads(ast_json)['value'], 'OR')
+        self.assertEqual(orjson.loads(ast_json)['left']['value'], 'AND')
+
+    def test_dict_to_node_shares_conditions(self):
+        data = operator('AND', operand('age', 30, 'gt'), operand('age', 30, 'gt'))
+        node = dict_to_node(data)
+        self.assertIsInstance(node.value, ANDOperator)
+        self.assertIs(node.left.value, node.right.value)
+
+        # Values of different types are kept apart.
+        node = dict_to_node(operator('OR', operand('score', 1, 'eq'), operand('score', 1.0, 'eq')))
+        self.assertIsInstance(node.value, OROperator)
+        self.assertIsNot(node.left.value, node.right.value)
+
+    def test_deep_rule_round_trip(self):
+        # Deeper than the 254 levels of nesting orjson can encode.
+        size = 300
+        rule = " AND ".join(f"x{i} = {i}" for i in range(size))
+        ast_json = root_to_json(Parser(tokenize(rule)).parse())
+        ast = json_to_ast(ast_json)
+        self.assertEqual(root_to_json(ast.root), ast_json)
+
+        values = {f'x{i}': i for i in range(size)}
+        self.assertTrue(ast.flatten().evaluate(values))
+        values['x0'] = -1
+        self.assertFalse(ast.flatten().evaluate(values))
+
+    def test_empty_rule(self):
+        self.assertEqual(root_to_json(None), "")
+        self.assertIsNone(dict_to_node(None))
+        self.assertIsNone(json_to_ast("null").root)
+
+    def test_parse_evaluate_payload(self):
+        self.assertEqual(
+            parse_evaluate_payload(b'{"rule_id": 1, "data": {"age": 30}}'),
+            (1, {"age": 30})
+        )
+        invalid = [
+            b'{"rule_id": 1,',
+            b'[1, {"age": 30}]',
+            b'{"data": {"age": 30}}',
+            b'{"rule_id": "1", "data": {"age": 30}}',
+            b'{"rule_id": true, "data": {"age": 30}}',
+            b'{"rule_id": 1}',
+            b'{"rule_id": 1, "data": [30]}',
+        ]
+        for body in invalid:
+            with self.subTest(body=body):
+                with self.assertRaises(ValueError):
+                    parse_evaluate_payload(body)
+
+    def test_data_cache_key(self):
+        self.assertEqual(data_cache_key({"b": 1, "a": [2]}), b'{"a":[2],"b":1}')
+        self.assertEqual(data_cache_key({"a": [2], "b": 1}), data_cache_key({"b": 1, "a": [2]}))
+
+        # Nesting accepted by the payload parser but too deep to encode.
+        body = b'{"rule_id": 1, "data": {"age": 35, "extra": ' + b'[' * 500 + b']' * 500 + b'}}'
+        _, data = parse_evaluate_payload(body)
+        self.assertIsNone(data_cache_key(data))
+
+if __name__ == '__main__':
+    unittest.main()
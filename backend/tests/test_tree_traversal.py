@@ -1,5 +1,6 @@
+import threading
 import unittest
-from rule_engine.ast_utils import Node, AST, Condition, ANDOperator, OROperator
+from rule_engine.ast_utils import Node, AST, Condition, ConditionStats, ANDOperator, OROperator, OR_OPERATOR, OP_AND, OP_OR, OP_OPERAND, combine_balanced
 
 class TestRuleEngine(unittest.TestCase):
     def test_condition_evaluate(self):
@@ -11,6 +12,28 @@ class TestRuleEngine(unittest.TestCase):
         self.assertTrue(condition_eq.evaluate("Sales"))
         self.assertFalse(condition_eq.evaluate("Marketing"))
 
+        condition_ge = Condition("experience", 5, 'ge')
+        self.assertTrue(condition_ge.evaluate(5))
+        self.assertFalse(condition_ge.evaluate(4))
+
+        condition_unknown = Condition("age", 30, 'between')
+        self.assertFalse(condition_unknown.evaluate(35))
+
+    def test_condition_symbols(self):
+        cases = [
+            ('>', 'gt', 31, 30),
+            ('<', 'lt', 29, 30),
+            ('=', 'eq', 30, 31),
+            ('>=', 'ge', 30, 29),
+            ('<=', 'le', 30, 31),
+            ('!=', 'ne', 31, 30),
+        ]
+        for symbol, comparison_type, matching, failing in cases:
+            condition = Condition("age", 30, symbol)
+            self.assertEqual(condition.comparison_type, comparison_type)
+            self.assertTrue(condition.evaluate(matching))
+            self.assertFalse(condition.evaluate(failing))
+
     def test_and_operator(self):
         left_condition = Condition("age", 30, 'gt')
         right_condition = Condition("salary", 50000, 'gt')
@@ -72,5 +95,136 @@ class TestRuleEngine(unittest.TestCase):
         json_data = {"age": 40, "department": "HR", "salary": 40000, "experience": 4}
         self.assertFalse(ast.evaluate_rule(json_data))
 
+    def test_ast_evaluate_short_circuit(self):
+        left_node = Node("operand", value=Condition("age", 30, 'gt'))
+        right_node = Node("operand", value=Condition("salary", 50000, 'gt'))
+
+        and_ast = AST(Node("operator", left=left_node, right=right_node, value=ANDOperator()))
+        stats = ConditionStats()
+        self.assertFalse(and_ast.evaluate_iter({"age": 25}, stats))
+        self.assertNotIn(ConditionStats.key(right_node.value), stats.counts)
+
+        or_ast = AST(Node("operator", left=left_node, right=right_node, value=OROperator()))
+        self.assertTrue(or_ast.evaluate_iter({"age": 35}, stats))
+        self.assertNotIn(ConditionStats.key(right_node.value), stats.counts)
+        self.assertFalse(or_ast.evaluate_iter({"age": 25}, stats))
+        self.assertIn(ConditionStats.key(right_node.value), stats.counts)
+
+    def test_ast_evaluate_missing_variable(self):
+        rule = AST(Node(
+            "operator",
+            left=Node("operand", value=Condition("age", 30, 'gt')),
+            right=Node("operand", value=Condition("vip", 1, 'ne')),
+            value=ANDOperator()
+        ))
+        for data in [{"age": 35}, {"vip": 0}, {"age": "35", "vip": 0}, {"age": None, "vip": 0}]:
+            self.assertFalse(rule.evaluate_rule(data))
+            self.assertFalse(rule.evaluate_iter(data))
+            self.assertFalse(rule.flatten().evaluate(data))
+        self.assertTrue(rule.evaluate_rule({"age": 35, "vip": 0}))
+
+    def test_ast_reorder_keeps_result(self):
+        age_condition = Condition("age", 30, 'gt')
+        vip_condition = Condition("vip", 1, 'eq')
+        stats = ConditionStats()
+        stats.record(age_condition, True)
+        stats.record(vip_condition, False)
+
+        rule = AST(Node("operator", left=Node("operand", value=age_condition), right=Node("operand", value=vip_condition), value=ANDOperator()))
+        rows = [{"age": 20}, {"vip": 1}, {"age": "x", "vip": 0}, {"age": 35, "vip": 1}, {}]
+        before = [rule.evaluate_rule(row) for row in rows]
+        self.assertTrue(rule.reorder(stats))
+        self.assertIs(rule.root.left.value, vip_condition)
+        self.assertEqual([rule.evaluate_rule(row) for row in rows], before)
+        self.assertEqual(before, [False, False, False, True, False])
+
+    def test_flat_ast_evaluate(self):
+        salary_condition = Condition("salary", 50000, 'gt')
+        experience_condition = Condition("experience", 5, 'gt')
+        or_node = Node("operator", left=Node("operand", value=salary_condition), right=Node("operand", value=experience_condition), value=OROperator())
+        root = Node("operator", left=Node("operand", value=Condition("age", 30, 'gt')), right=or_node, value=ANDOperator())
+
+        flat = AST(root).flatten()
+        self.assertEqual(list(flat.opcodes), [OP_OPERAND, OP_OPERAND, OP_OPERAND, OP_OR, OP_AND])
+
+        self.assertTrue(flat.evaluate({"age": 35, "salary": 40000, "experience": 6}))
+        self.assertFalse(flat.evaluate({"age": 35, "salary": 40000, "experience": 4}))
+        # Short-circuits past the OR subtree, which reads missing variables.
+        self.assertFalse(flat.evaluate({"age": 25}))
+        self.assertTrue(flat.evaluate({"age": 35, "salary": 60000}))
+
+    def test_ast_reorder(self):
+        age_condition = Condition("age", 30, 'gt')
+        salary_condition = Condition("salary", 50000, 'gt')
+
+        stats = ConditionStats()
+        for age, salary in [(35, 40000), (40, 45000), (25, 60000), (50, 30000)]:
+            stats.record(age_condition, age_condition.evaluate(age))
+            stats.record(salary_condition, salary_condition.evaluate(salary))
+        self.assertEqual(stats.true_rate(age_condition), 0.75)
+        self.assertEqual(stats.true_rate(salary_condition), 0.25)
+
+        and_ast = AST(Node("operator", left=Node("operand", value=age_condition), right=Node("operand", value=salary_condition), value=ANDOperator()))
+        self.assertTrue(and_ast.reorder(stats))
+        self.assertIs(and_ast.root.left.value, salary_condition)
+        self.assertFalse(and_ast.reorder(stats))
+
+        or_ast = AST(Node("operator", left=Node("operand", value=age_condition), right=Node("operand", value=salary_condition), value=OROperator()))
+        self.assertFalse(or_ast.reorder(stats))
+        self.assertIs(or_ast.root.left.value, age_condition)
+
+    def test_condition_stats_threads(self):
+        condition = Condition("age", 30, 'gt')
+        stats = ConditionStats()
+
+        def record():
+            for i in range(10000):
+                stats.record(condition, i % 4 == 0)
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.counts[ConditionStats.key(condition)], [20000, 80000])
+        self.assertEqual(stats.true_rate(condition), 0.25)
+
+    def test_ast_evaluate_deep_rule(self):
+        root = Node("operand", value=Condition("age", 30, 'gt'))
+        for _ in range(5000):
+            leaf = Node("operand", value=Condition("salary", 50000, 'gt'))
+            root = Node("operator", left=root, right=leaf, value=ANDOperator())
+        ast = AST(root)
+
+        self.assertTrue(ast.evaluate_rule({"age": 35, "salary": 60000}))
+        self.assertFalse(ast.evaluate_rule({"age": 35, "salary": 40000}))
+
+    def test_combine_balanced(self):
+        self.assertIsNone(combine_balanced([]))
+        single = Node("operand", value=Condition("x0", 0, 'eq'))
+        self.assertIs(combine_balanced([single]), single)
+
+        def depth(node):
+            if node.node_type == 'operand':
+                return 1
+            return 1 + max(depth(node.left), depth(node.right))
+
+        roots = [Node("operand", value=Condition(f"x{i}", i, 'eq')) for i in range(1000)]
+        combined = combine_balanced(roots)
+        self.assertIsInstance(combined.value, ANDOperator)
+        self.assertEqual(depth(combined), 11)
+        # Leaves keep their order from left to right.
+        operands = AST(combined).flatten().operand_table
+        self.assertEqual([condition.lvariable for condition in operands], [f"x{i}" for i in range(1000)])
+
+        values = {f"x{i}": i for i in range(1000)}
+        self.assertTrue(AST(combined).evaluate_rule(values))
+        values["x999"] = -1
+        self.assertFalse(AST(combined).evaluate_rule(values))
+
+        combined = combine_balanced(roots[:3], OR_OPERATOR)
+        self.assertIs(combined.value, OR_OPERATOR)
+        self.assertTrue(AST(combined).evaluate_rule({"x0": -1, "x1": -1, "x2": 2}))
+
 if __name__ == '__main__':
     unittest.main()
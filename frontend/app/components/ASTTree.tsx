@@ -15,7 +15,9 @@ interface ASTTreeProps {
 const convertToTreeNode = (node: ASTNode): TreeNodeDatum => {
     const treeNode = {
         name: node.node_type,
-        attributes: node.value ? { ...node.value } : {},
+        attributes: typeof node.value === 'string'
+            ? { operator: node.value }
+            : node.value ? { ...node.value } : {},
     } as TreeNodeDatum;
 
     const children: TreeNodeDatum[] = [];